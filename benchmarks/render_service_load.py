@@ -0,0 +1,125 @@
+"""Load-test a running render service.
+
+Start the service first (``python -m core.service``), or pass ``--spawn`` to
+launch one for the duration of the test, then run from the repository root:
+
+    python -m benchmarks.render_service_load [--clients 8] [--requests 50]
+
+Each client thread holds its own connection and sends requests back to back.
+Client-side latency and throughput are printed alongside the service's own
+counters.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from PIL import Image
+
+from core.service import SOCKET_NAME, RenderClient, parse_address
+
+RECIPE = [
+    ("Brightness", 115),
+    ("Contrast", 110),
+    ("Blur", None),
+    ("Saturation", 90),
+    ("Sharpen", None),
+]
+
+
+def make_source(size):
+    gradient = Image.linear_gradient("L").resize((size, size))
+    return Image.merge("RGB", (gradient, gradient.transpose(Image.Transpose.ROTATE_90), gradient))
+
+
+def run_client(address, authkey, image, requests, high_bit_depth, latencies, errors):
+    with RenderClient(address, authkey=authkey) as client:
+        for _ in range(requests):
+            started = time.perf_counter()
+            try:
+                client.render(image, RECIPE, high_bit_depth=high_bit_depth)
+            except RuntimeError:
+                errors.append(1)
+                continue
+            latencies.append(time.perf_counter() - started)
+
+
+def wait_for_service(address, authkey, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            RenderClient(address, authkey=authkey).close()
+            return
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--socket", help=f"UNIX socket path (default: {SOCKET_NAME} in $XDG_RUNTIME_DIR or a private temp directory)")
+    parser.add_argument("--port", type=int, help="connect to 127.0.0.1:PORT instead of a UNIX socket")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent client connections")
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--size", type=int, default=512, help="edge length of the test image")
+    parser.add_argument("--high-bit-depth", action="store_true", help="render with the float32 working pipeline")
+    parser.add_argument("--spawn", action="store_true", help="start a service for the duration of the test")
+    args = parser.parse_args()
+
+    address = parse_address(args.socket, args.port)
+    authkey = os.environ.get("IMAGE_EDITOR_RENDER_KEY")
+    if args.port is not None and not authkey:
+        parser.error("--port requires IMAGE_EDITOR_RENDER_KEY to be set")
+    authkey = authkey.encode() if authkey else None
+
+    service = None
+    if args.spawn:
+        command = [sys.executable, "-m", "core.service"]
+        command += ["--port", str(args.port)] if args.port else ["--socket", address]
+        service = subprocess.Popen(command)
+    try:
+        wait_for_service(address, authkey)
+        image = make_source(args.size)
+        latencies, errors = [], []
+        threads = [
+            threading.Thread(
+                target=run_client,
+                args=(address, authkey, image, args.requests, args.high_bit_depth, latencies, errors),
+            )
+            for _ in range(args.clients)
+        ]
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        completed = len(latencies)
+        print(f"{args.clients} clients x {args.requests} requests, {args.size}x{args.size} RGB")
+        print(f"completed: {completed}  errors: {len(errors)}  wall time: {elapsed:.2f}s")
+        if completed:
+            print(f"throughput: {completed / elapsed:.1f} req/s")
+            print(
+                f"latency ms  p50: {latencies[completed // 2] * 1000:.1f}"
+                f"  p95: {latencies[min(completed - 1, int(completed * 0.95))] * 1000:.1f}"
+                f"  max: {latencies[-1] * 1000:.1f}"
+            )
+
+        with RenderClient(address, authkey=authkey) as client:
+            print("service counters:")
+            for name, value in client.stats().items():
+                print(f"  {name:<16}{value:>12.2f}" if isinstance(value, float) else f"  {name:<16}{value:>12}")
+    finally:
+        if service:
+            service.terminate()
+            service.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Compare the per-op PIL path against the float32 working pipeline.
+
+Run from the repository root:
+
+    python -m benchmarks.working_pipeline [--size 2048] [--steps 20]
+
+Each path applies the same chain of adjustments and filters, keeping every
+step in a history list the way the editor does. Throughput is reported in
+operations per second and memory as the bytes held by that history plus the
+peak RSS of a fresh worker process.
+"""
+import argparse
+import multiprocessing
+import resource
+import time
+
+import numpy as np
+from PIL import Image, ImageEnhance, ImageFilter, ImageOps
+
+from core.working import WorkingImage
+
+CHAIN = [
+    ("Brightness", 1.1),
+    ("Contrast", 1.2),
+    ("Saturation", 0.9),
+    ("Blur", None),
+    ("Brightness", 0.8),
+    ("Sharpen", None),
+    ("Contrast", 0.9),
+    ("Negative", None),
+]
+
+
+def make_source(size):
+    """Build a smooth 16-bit gradient, the kind of input that bands at 8 bits."""
+    ramp = np.linspace(0, 65535, size, dtype=np.float64)
+    pixels = np.add.outer(ramp, ramp) / 2
+    return Image.fromarray(pixels.astype(np.uint16))
+
+
+def pil_step(image, op, factor):
+    if op == "Brightness":
+        return ImageEnhance.Brightness(image).enhance(factor)
+    if op == "Contrast":
+        return ImageEnhance.Contrast(image).enhance(factor)
+    if op == "Saturation":
+        return ImageEnhance.Color(image).enhance(factor)
+    if op == "Blur":
+        return image.filter(ImageFilter.BLUR)
+    if op == "Sharpen":
+        return image.filter(ImageFilter.SHARPEN)
+    return ImageOps.invert(image)
+
+
+def working_step(image, op, factor):
+    if op == "Brightness":
+        return image.brightness(factor)
+    if op == "Contrast":
+        return image.contrast(factor)
+    if op == "Saturation":
+        return image.saturation(factor)
+    if op == "Blur":
+        return image.blur()
+    if op == "Sharpen":
+        return image.sharpen()
+    return image.negative()
+
+
+def image_bytes(image):
+    if isinstance(image, WorkingImage):
+        return image.pixels.nbytes + (image.alpha.nbytes if image.alpha is not None else 0)
+    return len(image.getbands()) * image.width * image.height
+
+
+def run_path(path, size, steps, results):
+    source = make_source(size)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    if path == "pil":
+        # The editor's per-op path: 16-bit input has to be converted to an
+        # 8-bit mode before ImageEnhance will touch it.
+        image = Image.fromarray((np.asarray(source) >> 8).astype(np.uint8))
+        step = pil_step
+    else:
+        image = WorkingImage.from_pil(source)
+        step = working_step
+
+    history = [image]
+    for index in range(steps):
+        op, factor = CHAIN[index % len(CHAIN)]
+        image = step(image, op, factor)
+        history.append(image)
+
+    final = image.to_pil() if isinstance(image, WorkingImage) else image
+    elapsed = time.perf_counter() - start
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results[path] = {
+        "seconds": elapsed,
+        "ops_per_second": steps / elapsed,
+        "history_bytes": sum(image_bytes(item) for item in history),
+        "peak_rss_delta_kb": peak_rss - baseline_rss,
+        "distinct_levels": len(np.unique(np.asarray(final.convert("L")))),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=2048, help="edge length of the test image")
+    parser.add_argument("--steps", type=int, default=20, help="number of operations in the chain")
+    args = parser.parse_args()
+
+    manager = multiprocessing.Manager()
+    results = manager.dict()
+    for path in ("pil", "working"):
+        # A fresh process per path keeps the peak RSS numbers independent
+        worker = multiprocessing.Process(target=run_path, args=(path, args.size, args.steps, results))
+        worker.start()
+        worker.join()
+
+    print(f"{args.size}x{args.size} image, {args.steps} operations")
+    print(f"{'path':<10}{'seconds':>10}{'ops/s':>10}{'history MB':>14}{'peak RSS MB':>14}{'levels':>9}")
+    for path in ("pil", "working"):
+        stats = results[path]
+        print(
+            f"{path:<10}"
+            f"{stats['seconds']:>10.3f}"
+            f"{stats['ops_per_second']:>10.1f}"
+            f"{stats['history_bytes'] / 2**20:>14.1f}"
+            f"{stats['peak_rss_delta_kb'] / 1024:>14.1f}"
+            f"{stats['distinct_levels']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
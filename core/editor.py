@@ -22,11 +22,13 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtGui import QPixmap, QImage
 from PyQt5.QtCore import Qt
-from PIL import Image, ImageEnhance
+from PIL import Image
 import io
 from .themes import ThemeManager
 from .delegates import DeleteIconDelegate
 from .filters import Filter
+from .pipeline import adjust
+from .working import WorkingImage
 
 class ImageEditor(QMainWindow):
     def __init__(self):
@@ -43,6 +45,7 @@ class ImageEditor(QMainWindow):
         self.image_history = []
         self.history_index = -1
         self.selected_parent = None
+        self.high_bit_depth = False
 
         # Setup UI components
         self.setup_ui()
@@ -87,6 +90,11 @@ class ImageEditor(QMainWindow):
             self.theme_actions[theme] = action
             theme_menu.addAction(action)
 
+        self.high_bit_depth_action = QAction("High Bit-Depth Mode", self)
+        self.high_bit_depth_action.setCheckable(True)
+        self.high_bit_depth_action.toggled.connect(self.set_high_bit_depth)
+        pref_menu.addAction(self.high_bit_depth_action)
+
         edit_menu = menubar.addMenu("&Edit")
         edit_actions = [
             ("Undo", self.undo, "Ctrl+Z"),
@@ -274,14 +282,25 @@ class ImageEditor(QMainWindow):
 
         self.history_tree.clearSelection()
 
+    def set_high_bit_depth(self, enabled):
+        """Decode images opened from now on into a float32 working buffer."""
+        self.high_bit_depth = enabled
+        state = "enabled" if enabled else "disabled"
+        self.status_bar.showMessage(
+            f"High bit-depth mode {state} (applies to the next opened image)", 3000
+        )
+
     def open_image(self):
         try:
             file_path, _ = QFileDialog.getOpenFileName(
-                self, "Open Image", "", "Image Files (*.png *.jpg *.jpeg *.bmp *.gif)"
+                self, "Open Image", "", "Image Files (*.png *.jpg *.jpeg *.bmp *.gif *.tif *.tiff)"
             )
             if file_path:
                 logging.info(f"Opening image: {file_path}")
-                self.original_image = Image.open(file_path)
+                if self.high_bit_depth:
+                    self.original_image = WorkingImage.open(file_path)
+                else:
+                    self.original_image = Image.open(file_path)
                 self.current_image = self.original_image.copy()
                 self.add_to_history(self.current_image)
                 self.display_image(self.current_image)
@@ -297,6 +316,9 @@ class ImageEditor(QMainWindow):
 
     def display_image(self, image):
         try:
+            if isinstance(image, WorkingImage):
+                image = image.to_pil()
+
             buffer = io.BytesIO()
             image.save(buffer, format="PNG")
             buffer.seek(0)
@@ -373,17 +395,10 @@ class ImageEditor(QMainWindow):
     def adjust_image(self, adjustment_type, value):
         if self.current_image:
             try:
-                if adjustment_type == "Brightness":
-                    enhancer = ImageEnhance.Brightness(self.current_image)
-                    self.current_image = enhancer.enhance(value / 100)
-                elif adjustment_type == "Contrast":
-                    enhancer = ImageEnhance.Contrast(self.current_image)
-                    self.current_image = enhancer.enhance(value / 100)
-                elif adjustment_type == "Saturation":
-                    enhancer = ImageEnhance.Color(self.current_image)
-                    self.current_image = enhancer.enhance(value / 100)
-                else:
+                adjusted = adjust(self.current_image, adjustment_type, value)
+                if adjusted is None:
                     return
+                self.current_image = adjusted
 
                 self.add_to_history(self.current_image)
                 self.display_image(self.current_image)
@@ -1,4 +1,5 @@
 from PIL import ImageFilter, ImageOps
+from .working import WorkingImage
 
 
 class Filter:    
@@ -6,7 +7,10 @@ class Filter:
     def grayscale(cls, current_image, history, display, log_activity, show_error):
         if current_image:
             try:
-                current_image = current_image.convert("L")
+                if isinstance(current_image, WorkingImage):
+                    current_image = current_image.grayscale()
+                else:
+                    current_image = current_image.convert("L")
                 history(current_image)
                 display(current_image)
 
@@ -20,7 +24,10 @@ class Filter:
     def blur(cls, current_image, history, display, log_activity, show_error):
         if current_image:
             try:
-                current_image = current_image.filter(ImageFilter.BLUR)
+                if isinstance(current_image, WorkingImage):
+                    current_image = current_image.blur()
+                else:
+                    current_image = current_image.filter(ImageFilter.BLUR)
                 history(current_image)
                 display(current_image)
 
@@ -33,7 +40,10 @@ class Filter:
     def sharpen(cls, current_image, history, display, log_activity, show_error):
         if current_image:
             try:
-                current_image = current_image.filter(ImageFilter.SHARPEN)
+                if isinstance(current_image, WorkingImage):
+                    current_image = current_image.sharpen()
+                else:
+                    current_image = current_image.filter(ImageFilter.SHARPEN)
                 history(current_image)
                 display(current_image)
 
@@ -47,7 +57,10 @@ class Filter:
     def negative(cls, current_image, history, display, log_activity, show_error):
         if current_image:
             try:
-                current_image = ImageOps.invert(current_image)
+                if isinstance(current_image, WorkingImage):
+                    current_image = current_image.negative()
+                else:
+                    current_image = ImageOps.invert(current_image)
                 history(current_image)
                 display(current_image)
 
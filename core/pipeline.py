@@ -0,0 +1,56 @@
+from PIL import ImageEnhance
+from .filters import Filter
+from .working import WorkingImage
+
+FILTERS = {
+    "Grayscale": Filter.grayscale,
+    "Blur": Filter.blur,
+    "Sharpen": Filter.sharpen,
+    "Negative": Filter.negative,
+}
+
+
+def adjust(image, adjustment_type, value):
+    """Apply a slider adjustment (value in slider units, 100 = unchanged).
+
+    Returns None for an unknown adjustment type.
+    """
+    factor = value / 100
+    if isinstance(image, WorkingImage):
+        adjust_method = {
+            "Brightness": image.brightness,
+            "Contrast": image.contrast,
+            "Saturation": image.saturation,
+        }.get(adjustment_type)
+        return adjust_method(factor) if adjust_method else None
+
+    enhancer = {
+        "Brightness": ImageEnhance.Brightness,
+        "Contrast": ImageEnhance.Contrast,
+        "Saturation": ImageEnhance.Color,
+    }.get(adjustment_type)
+    return enhancer(image).enhance(factor) if enhancer else None
+
+
+def apply_recipe(image, recipe):
+    """Run a recipe headlessly and return the resulting image.
+
+    A recipe is a list of (name, value) steps, e.g.
+    [("Brightness", 120), ("Blur", None)]. Filter steps ignore their value.
+    """
+    errors = []
+
+    def ignore(*args):
+        pass
+
+    for name, value in recipe:
+        if name in FILTERS:
+            image = FILTERS[name](image, ignore, ignore, ignore, errors.append)
+            if errors:
+                raise ValueError(errors[0])
+        else:
+            adjusted = adjust(image, name, value)
+            if adjusted is None:
+                raise ValueError(f"Unknown recipe step: {name}")
+            image = adjusted
+    return image
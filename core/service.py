@@ -0,0 +1,416 @@
+"""Headless render service for the editing pipeline.
+
+Run with ``python -m core.service`` to listen on a UNIX socket in a private
+per-user directory, or pass ``--port`` to listen on localhost TCP instead
+(this requires an auth key in ``IMAGE_EDITOR_RENDER_KEY``, since requests are
+pickled). Clients hand over pixels in a shared memory block they own; only
+the block name, the image geometry and the recipe travel over the socket. The
+service renders into the same block and replies with the geometry of the
+result.
+"""
+import argparse
+import logging
+import os
+import secrets
+import signal
+import socket
+import stat
+import struct
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import AuthenticationError, resource_tracker
+from multiprocessing.connection import Client, Listener, answer_challenge, deliver_challenge
+from multiprocessing.shared_memory import SharedMemory
+from PIL import Image
+from .pipeline import apply_recipe
+from .working import WorkingImage
+
+SOCKET_NAME = "image_editor_render.sock"
+# Seconds a new connection gets to complete the auth key handshake
+HANDSHAKE_TIMEOUT = 5
+# Seconds of completed requests that throughput_rps is averaged over
+THROUGHPUT_WINDOW = 60
+# Modes sent as-is; anything else is converted to RGB/RGBA by the client
+RAW_MODES = ("L", "RGB", "RGBA", "I;16", "I", "F")
+# Workers only attach to blocks created by RenderClient
+SHM_PREFIX = "image_editor_render_"
+REQUIRED_KEYS = ("shm", "mode", "size", "nbytes", "recipe")
+
+
+def default_socket():
+    """Return the socket path in $XDG_RUNTIME_DIR, or a private temp directory.
+
+    The directory must belong to the current user and be closed to everyone
+    else, otherwise another user could plant a socket there.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        runtime_dir = os.path.join(tempfile.gettempdir(), f"image_editor_render-{os.getuid()}")
+        try:
+            os.mkdir(runtime_dir, 0o700)
+        except FileExistsError:
+            pass
+
+    info = os.lstat(runtime_dir)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(f"{runtime_dir} must be a directory owned by the current user with mode 0700")
+    return os.path.join(runtime_dir, SOCKET_NAME)
+
+
+def _set_timeout(conn, seconds):
+    """Set the send/receive timeout of a Connection's socket (0 blocks forever)."""
+    sock = socket.socket(fileno=os.dup(conn.fileno()))
+    try:
+        timeval = struct.pack("ll", seconds, 0)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, timeval)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, timeval)
+    finally:
+        sock.close()
+
+
+def _attach(name):
+    if not isinstance(name, str) or not name.startswith(SHM_PREFIX):
+        raise ValueError(f"Shared memory name must start with {SHM_PREFIX}")
+    shm = SharedMemory(name=name)
+    # The client owns the block, so keep this process's tracker from
+    # unlinking it when the worker exits
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+def _warm_up():
+    """Pool initializer: pay the import and first-call costs up front."""
+    sample = Image.new("RGB", (16, 16))
+    apply_recipe(sample, [("Brightness", 110), ("Blur", None)])
+    apply_recipe(WorkingImage.from_pil(sample), [("Contrast", 110), ("Sharpen", None)])
+
+
+def _ping():
+    return True
+
+
+def render(job):
+    """Render one job inside a pool worker. Errors are returned, not raised."""
+    started = time.perf_counter()
+    shm = None
+    try:
+        shm = _attach(job["shm"])
+        view = shm.buf[: job["nbytes"]]
+        try:
+            image = Image.frombytes(job["mode"], tuple(job["size"]), view)
+        finally:
+            view.release()
+
+        if job.get("high_bit_depth"):
+            image = WorkingImage.from_pil(image)
+        result = apply_recipe(image, job["recipe"])
+        if isinstance(result, WorkingImage):
+            result = result.to_pil()
+
+        data = result.tobytes()
+        if len(data) > shm.size:
+            return {"error": f"Result of {len(data)} bytes does not fit the shared buffer"}
+        shm.buf[: len(data)] = data
+        return {
+            "mode": result.mode,
+            "size": result.size,
+            "nbytes": len(data),
+            "render_seconds": time.perf_counter() - started,
+        }
+    except Exception as e:
+        return {"error": f"Error rendering image: {str(e)}"}
+    finally:
+        if shm:
+            shm.close()
+
+
+class RenderStats:
+    """Thread-safe latency and throughput counters."""
+
+    def __init__(self, window=1000):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=window)
+        self.render_times = deque(maxlen=window)
+        # Completion times within the last THROUGHPUT_WINDOW seconds
+        self.completed = deque()
+
+    def _prune(self, now):
+        while self.completed and now - self.completed[0] > THROUGHPUT_WINDOW:
+            self.completed.popleft()
+
+    def record(self, latency, result):
+        now = time.monotonic()
+        with self.lock:
+            self.requests += 1
+            self.latencies.append(latency)
+            self.completed.append(now)
+            self._prune(now)
+            if "error" in result:
+                self.errors += 1
+            else:
+                self.render_times.append(result["render_seconds"])
+
+    def record_error(self):
+        """Count a request that was rejected before reaching the pool."""
+        with self.lock:
+            self.requests += 1
+            self.errors += 1
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self.lock:
+            self._prune(now)
+            uptime = now - self.started
+            window = min(uptime, THROUGHPUT_WINDOW)
+            recent = len(self.completed)
+            latencies = sorted(self.latencies)
+            render_times = list(self.render_times)
+            requests = self.requests
+            errors = self.errors
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+        return {
+            "uptime_seconds": uptime,
+            "requests": requests,
+            "errors": errors,
+            "throughput_rps": recent / window if window else 0.0,
+            "latency_p50_ms": percentile(0.50),
+            "latency_p95_ms": percentile(0.95),
+            "latency_max_ms": latencies[-1] * 1000 if latencies else 0.0,
+            "mean_render_ms": sum(render_times) / len(render_times) * 1000 if render_times else 0.0,
+        }
+
+
+class RenderServer:
+    def __init__(self, address=None, workers=None, authkey=None):
+        if address is None:
+            address = default_socket()
+        if not isinstance(address, str) and not authkey:
+            # Messages are unpickled, so an open TCP port would run anyone's code
+            raise ValueError("An auth key is required when listening on TCP")
+        self.address = address
+        self.authkey = authkey
+        self.workers = workers
+        self.stats = RenderStats()
+        self.pool_lock = threading.Lock()
+        # Start the pool before any threads so the workers fork from a clean process
+        self.pool = self.start_pool()
+        self.listener = None
+
+    def start_pool(self):
+        pool = ProcessPoolExecutor(self.workers, initializer=_warm_up)
+        # The first submit forks every worker, so they are warm before any request
+        pool.submit(_ping).result()
+        return pool
+
+    def check_socket_path(self):
+        """Remove a stale socket file, refusing to touch anything else."""
+        try:
+            mode = os.stat(self.address).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise RuntimeError(f"{self.address} exists and is not a socket")
+
+        probe = socket.socket(socket.AF_UNIX)
+        try:
+            probe.connect(self.address)
+        except ConnectionRefusedError:
+            os.unlink(self.address)
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"A render service is already listening on {self.address}")
+
+    def serve_forever(self):
+        try:
+            if isinstance(self.address, str):
+                self.check_socket_path()
+            # Bind under a restrictive umask so the socket is never reachable
+            # by other users, not even briefly
+            old_umask = os.umask(0o177)
+            try:
+                # The auth key handshake runs per connection in handle_connection
+                self.listener = Listener(self.address)
+            finally:
+                os.umask(old_umask)
+            logging.info(f"Render service listening on {self.address}")
+
+            while True:
+                try:
+                    conn = self.listener.accept()
+                except OSError as e:
+                    logging.error(f"Error accepting connection: {str(e)}")
+                    continue
+                threading.Thread(target=self.handle_connection, args=(conn,), daemon=True).start()
+        finally:
+            self.close()
+
+    def close(self):
+        if self.listener:
+            self.listener.close()
+            self.listener = None
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.unlink(self.address)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def authenticate(self, conn):
+        """Run the auth key handshake, giving up after HANDSHAKE_TIMEOUT seconds."""
+        try:
+            _set_timeout(conn, HANDSHAKE_TIMEOUT)
+            deliver_challenge(conn, self.authkey)
+            answer_challenge(conn, self.authkey)
+            _set_timeout(conn, 0)
+            return True
+        except (OSError, EOFError, AuthenticationError) as e:
+            logging.error(f"Rejected connection: {str(e)}")
+            return False
+
+    def handle_connection(self, conn):
+        with conn:
+            if self.authkey and not self.authenticate(conn):
+                return
+            try:
+                while True:
+                    conn.send(self.handle_message(conn.recv()))
+            except (EOFError, OSError):
+                # Client went away
+                return
+
+    def handle_message(self, message):
+        if not isinstance(message, dict):
+            self.stats.record_error()
+            return {"error": "Request must be a dict"}
+        if message.get("type") == "stats":
+            return self.stats.snapshot()
+        if message.get("type") != "render":
+            self.stats.record_error()
+            return {"error": f"Unknown request type: {message.get('type')}"}
+
+        missing = [key for key in REQUIRED_KEYS if key not in message]
+        if missing:
+            self.stats.record_error()
+            return {"error": f"Render request is missing: {', '.join(missing)}"}
+
+        queued = time.perf_counter()
+        result = self.run(message)
+        self.stats.record(time.perf_counter() - queued, result)
+        return result
+
+    def run(self, job):
+        """Render a job as its own pool task, restarting the pool if a worker dies.
+
+        Separate tasks mean a small job never waits for a larger one submitted
+        at the same time.
+        """
+        pool = self.pool
+        try:
+            return pool.submit(render, job).result()
+        except BrokenProcessPool:
+            with self.pool_lock:
+                if self.pool is pool:
+                    logging.error("A render worker died; restarting the pool")
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self.pool = self.start_pool()
+            return {"error": "Render worker died while rendering this image"}
+        except Exception as e:
+            return {"error": f"Error rendering image: {str(e)}"}
+
+
+class RenderClient:
+    """Blocking client for a running render service."""
+
+    def __init__(self, address=None, authkey=None):
+        self.conn = Client(address or default_socket(), authkey=authkey)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def render(self, image, recipe, high_bit_depth=False):
+        """Render an image with a recipe and return the resulting PIL image."""
+        if image.mode not in RAW_MODES:
+            has_alpha = "A" in image.getbands() or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        data = image.tobytes()
+        shm = SharedMemory(name=SHM_PREFIX + secrets.token_hex(8), create=True, size=len(data))
+        try:
+            shm.buf[: len(data)] = data
+            self.conn.send(
+                {
+                    "type": "render",
+                    "shm": shm.name,
+                    "mode": image.mode,
+                    "size": image.size,
+                    "nbytes": len(data),
+                    "recipe": list(recipe),
+                    "high_bit_depth": high_bit_depth,
+                }
+            )
+            result = self.conn.recv()
+            if "error" in result:
+                raise RuntimeError(result["error"])
+            return Image.frombytes(result["mode"], tuple(result["size"]), bytes(shm.buf[: result["nbytes"]]))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def stats(self):
+        self.conn.send({"type": "stats"})
+        return self.conn.recv()
+
+
+def parse_address(socket_path=None, port=None):
+    if port is not None:
+        return ("127.0.0.1", port)
+    return socket_path or default_socket()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the image editing pipeline as a local render service.")
+    parser.add_argument("--socket", help=f"UNIX socket path (default: {SOCKET_NAME} in $XDG_RUNTIME_DIR or a private temp directory)")
+    parser.add_argument("--port", type=int, help="listen on 127.0.0.1:PORT instead of a UNIX socket")
+    parser.add_argument("--workers", type=int, help="number of worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    authkey = os.environ.get("IMAGE_EDITOR_RENDER_KEY")
+    if args.port is not None and not authkey:
+        parser.error("--port requires IMAGE_EDITOR_RENDER_KEY to be set")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    # Exit through serve_forever's cleanup so the socket file is removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server = RenderServer(
+            parse_address(args.socket, args.port),
+            workers=args.workers,
+            authkey=authkey.encode() if authkey else None,
+        )
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Render service stopped")
+    except RuntimeError as e:
+        logging.error(str(e))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
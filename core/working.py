@@ -0,0 +1,189 @@
+import os
+import numpy as np
+from PIL import Image, ImageFilter
+
+try:
+    # Optional: Pillow decodes 16-bit colour TIFFs as 8-bit RGB
+    import tifffile
+except ImportError:
+    tifffile = None
+
+# ITU-R 601-2 luma weights, the same ones PIL uses for convert("L")
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+class WorkingImage:
+    """Float32 image buffer used by the high bit-depth working mode.
+
+    Pixels are decoded once into the 0.0-1.0 range and every adjustment and
+    filter runs on that buffer without clipping or re-quantizing. Conversion
+    back to an 8-bit PIL image only happens for display and export.
+
+    Pillow only keeps 16-bit precision for single-channel images; 16-bit
+    colour PNGs arrive already reduced to 8 bits. 16-bit grayscale and RGB
+    TIFFs keep their precision when tifffile is installed (see open()).
+    """
+
+    def __init__(self, pixels, alpha=None):
+        self.pixels = pixels
+        self.alpha = alpha
+
+    @classmethod
+    def open(cls, path):
+        """Decode an image file, reading TIFFs with tifffile when available."""
+        if tifffile and os.path.splitext(path)[1].lower() in (".tif", ".tiff"):
+            pixels = cls._read_high_bit_tiff(path)
+            if pixels is not None:
+                return cls.from_array(pixels)
+        with Image.open(path) as image:
+            return cls.from_pil(image)
+
+    @staticmethod
+    def _read_high_bit_tiff(path):
+        """Read a >8-bit grayscale or RGB TIFF with tifffile.
+
+        Returns None for anything else (palette, CMYK, 8-bit, planar,
+        unsupported compression...) so Pillow decodes it instead.
+        """
+        try:
+            with tifffile.TiffFile(path) as tif:
+                page = tif.pages[0]
+                if page.photometric not in (tifffile.PHOTOMETRIC.MINISBLACK, tifffile.PHOTOMETRIC.RGB):
+                    return None
+                if page.bitspersample <= 8 or page.axes not in ("YX", "YXS"):
+                    return None
+                pixels = page.asarray()
+        except Exception:
+            return None
+
+        if pixels.ndim == 2 or (pixels.ndim == 3 and pixels.shape[2] in (1, 3, 4)):
+            return pixels
+        return None
+
+    @classmethod
+    def from_array(cls, array):
+        """Wrap an HxW or HxWxC (C = 1, 3 or 4) integer or float array.
+
+        Integer arrays are scaled by their dtype's maximum; float arrays are
+        expected to already be in the 0.0-1.0 range.
+        """
+        if np.issubdtype(array.dtype, np.integer):
+            pixels = array.astype(np.float32) / np.iinfo(array.dtype).max
+        else:
+            pixels = array.astype(np.float32)
+
+        alpha = None
+        if pixels.ndim == 3 and pixels.shape[2] == 4:
+            pixels, alpha = pixels[:, :, :3], pixels[:, :, 3]
+        if pixels.ndim == 2:
+            pixels = pixels[:, :, np.newaxis]
+        return cls(np.ascontiguousarray(pixels), alpha)
+
+    @classmethod
+    def from_pil(cls, image):
+        """Decode a PIL image into a float32 working buffer.
+
+        Mode "F" images are expected to already be in the 0.0-1.0 range.
+        """
+        alpha = None
+        if image.mode.startswith("I"):
+            pixels = np.asarray(image, dtype=np.float32) / 65535.0
+        elif image.mode == "F":
+            pixels = np.asarray(image, dtype=np.float32)
+        elif image.mode in ("L", "RGB"):
+            pixels = np.asarray(image, dtype=np.float32) / 255.0
+        else:
+            if "A" in image.getbands() or "transparency" in image.info:
+                image = image.convert("RGBA")
+                alpha = np.asarray(image.getchannel("A"), dtype=np.float32) / 255.0
+            pixels = np.asarray(image.convert("RGB"), dtype=np.float32) / 255.0
+
+        if pixels.ndim == 2:
+            pixels = pixels[:, :, np.newaxis]
+        return cls(pixels, alpha)
+
+    @property
+    def size(self):
+        height, width = self.pixels.shape[:2]
+        return width, height
+
+    @property
+    def mode(self):
+        return "L" if self.pixels.shape[2] == 1 else "RGB"
+
+    def copy(self):
+        alpha = self.alpha.copy() if self.alpha is not None else None
+        return WorkingImage(self.pixels.copy(), alpha)
+
+    def _luma(self):
+        if self.pixels.shape[2] == 1:
+            return self.pixels
+        return (self.pixels @ LUMA_WEIGHTS)[:, :, np.newaxis]
+
+    def _blend(self, degenerate, factor):
+        # Same interpolation ImageEnhance uses, without the clip to 8 bits
+        return WorkingImage(degenerate + factor * (self.pixels - degenerate), self.alpha)
+
+    def brightness(self, factor):
+        return WorkingImage(self.pixels * np.float32(factor), self.alpha)
+
+    def contrast(self, factor):
+        mean = np.float32(self._luma().mean())
+        return self._blend(mean, np.float32(factor))
+
+    def saturation(self, factor):
+        return self._blend(self._luma(), np.float32(factor))
+
+    def grayscale(self):
+        return WorkingImage(self._luma(), self.alpha)
+
+    def negative(self):
+        return WorkingImage(1.0 - self.pixels, self.alpha)
+
+    def blur(self):
+        return self._convolve(ImageFilter.BLUR)
+
+    def sharpen(self):
+        return self._convolve(ImageFilter.SHARPEN)
+
+    def _convolve(self, kernel_filter):
+        """Apply one of PIL's built-in kernels.
+
+        Like PIL, pixels closer to the edge than half the kernel size are
+        copied through unchanged.
+        """
+        (width, height), scale, offset, kernel = kernel_filter.filterargs
+        kernel = np.asarray(kernel, dtype=np.float32).reshape(height, width) / scale
+        pad_y, pad_x = height // 2, width // 2
+
+        result = self.pixels.copy()
+        rows, cols = self.pixels.shape[0] - 2 * pad_y, self.pixels.shape[1] - 2 * pad_x
+        if rows <= 0 or cols <= 0:
+            return WorkingImage(result, self.alpha)
+
+        interior = np.full((rows, cols, self.pixels.shape[2]), offset / 255.0, dtype=np.float32)
+        for y in range(height):
+            for x in range(width):
+                weight = kernel[y, x]
+                if weight:
+                    interior += weight * self.pixels[y : y + rows, x : x + cols]
+        result[pad_y : pad_y + rows, pad_x : pad_x + cols] = interior
+        return WorkingImage(result, self.alpha)
+
+    def to_pil(self):
+        """Quantize the working buffer to an 8-bit PIL image."""
+        pixels = np.clip(self.pixels, 0.0, 1.0) * 255.0 + 0.5
+        pixels = pixels.astype(np.uint8)
+        if pixels.shape[2] == 1:
+            image = Image.fromarray(pixels[:, :, 0])
+        else:
+            image = Image.fromarray(pixels)
+
+        if self.alpha is not None:
+            alpha = (np.clip(self.alpha, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+            image = image.convert("RGBA")
+            image.putalpha(Image.fromarray(alpha))
+        return image
+
+    def save(self, fp, format=None, **params):
+        self.to_pil().save(fp, format, **params)